@@ -4,6 +4,7 @@ import logging
 from typing import List
 
 from spanreed.plugin import Plugin
+from spanreed.apis.http_session import close_http_session
 
 from spanreed.apis.telegram_bot import TelegramBotPlugin
 from spanreed.plugins.todoist import TodoistPlugin
@@ -65,9 +66,12 @@ async def run_all_tasks() -> None:
         f"{[plugin.canonical_name() for plugin in plugins]}"
     )
 
-    async with asyncio.TaskGroup() as tg:
-        for plugin in plugins:
-            tg.create_task(plugin.run())
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for plugin in plugins:
+                tg.create_task(plugin.run())
+    finally:
+        await close_http_session()
 
     logging.error("All plugins have stopped. Exiting.")
 
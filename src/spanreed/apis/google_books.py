@@ -1,14 +1,18 @@
 import datetime
 import logging
 
-import aiohttp
 from typing import Optional, Any
 from dataclasses import dataclass
 import re
 import dateutil.parser
 
+from spanreed.apis.http_session import get_http_session
 
-@dataclass
+# Characters that Obsidian doesn't allow in note names.
+UNSUPPORTED_TITLE_CHARACTERS = re.compile(r"""[*"\/\\<>:|?]+""")
+
+
+@dataclass(slots=True)
 class Book:
     title: str
     authors: list[str]
@@ -25,8 +29,7 @@ class Book:
     # For Obsidian compatibility.
     @property
     def short_title(self) -> str:
-        unsupported_characters = r"""[*"\/\\<>:|?]+"""
-        return re.split(unsupported_characters, self.title)[0]
+        return UNSUPPORTED_TITLE_CHARACTERS.split(self.title, maxsplit=1)[0]
 
     @property
     def formatted_authors(self) -> str:
@@ -67,11 +70,10 @@ class GoogleBooks:
     async def get_books(self, query: str) -> list[Book]:
         url = f"{self.BASE_URL}?q={query}&key={self.api_key}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return self._get_books_from_json(data)
+        async with get_http_session().get(url) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return self._get_books_from_json(data)
 
     def _get_books_from_json(self, data: dict[str, Any]) -> list[Book]:
         items = data.get("items", [])
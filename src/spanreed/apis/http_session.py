@@ -0,0 +1,36 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the process-wide HTTP session, creating it on first use.
+
+    Sharing one session lets every API client reuse pooled keep-alive
+    connections instead of paying a TCP/TLS handshake per request.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    # A session is bound to the event loop it was created on.
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            # Requests are sparse (user-driven), so keep idle connections and
+            # resolved addresses around longer than aiohttp's defaults.
+            connector=aiohttp.TCPConnector(
+                keepalive_timeout=60, ttl_dns_cache=300
+            )
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session, _session_loop
+    if _session is not None:
+        await _session.close()
+    _session = None
+    _session_loop = None
@@ -0,0 +1,20 @@
+import asyncio
+
+import aiohttp
+
+from spanreed.apis.http_session import get_http_session, close_http_session
+
+
+def test_get_http_session_is_shared_per_loop() -> None:
+    async def get_sessions() -> tuple[aiohttp.ClientSession, ...]:
+        sessions = (get_http_session(), get_http_session())
+        await close_http_session()
+        assert sessions[0].closed
+        return sessions
+
+    first, second = asyncio.run(get_sessions())
+    assert first is second
+
+    # A closed session is replaced.
+    third, _ = asyncio.run(get_sessions())
+    assert third is not first
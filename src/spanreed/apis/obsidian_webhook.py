@@ -1,11 +1,10 @@
 import logging
 
-import aiohttp
-
 from spanreed.plugin import Plugin
 from dataclasses import dataclass
 from spanreed.user import User
 from spanreed.apis.telegram_bot import TelegramBotApi
+from spanreed.apis.http_session import get_http_session
 
 
 @dataclass
@@ -46,19 +45,18 @@ class ObsidianWebhookApi:
 
     async def append_to_note(self, note_path: str, content: str) -> None:
         # Use aiohttp to POST the content to the webhook
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self._webhook_url,
-                params={
-                    "path": note_path,
-                },
-                data=content,
-            ) as response:
-                self._logger.info(
-                    f"{response.url=} resulted in {response.status=}"
+        async with get_http_session().post(
+            self._webhook_url,
+            params={
+                "path": note_path,
+            },
+            data=content,
+        ) as response:
+            self._logger.info(
+                f"{response.url=} resulted in {response.status=}"
+            )
+            if response.status != 200:
+                self._logger.error(
+                    f"Failed to append to note {note_path}: "
+                    f"{response.status=}"
                 )
-                if response.status != 200:
-                    self._logger.error(
-                        f"Failed to append to note {note_path}: "
-                        f"{response.status=}"
-                    )
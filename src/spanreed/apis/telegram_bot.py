@@ -5,7 +5,15 @@ import os
 from enum import auto, IntEnum
 import logging
 import uuid
-from typing import NamedTuple, Optional, Callable, cast, Awaitable, Coroutine
+from typing import (
+    NamedTuple,
+    Optional,
+    Callable,
+    cast,
+    Awaitable,
+    Coroutine,
+    Sequence,
+)
 from dataclasses import dataclass
 from collections.abc import AsyncGenerator
 
@@ -37,6 +45,8 @@ USER_INTERACTION_QUEUES = "user-interaction-queue"
 CURRENT_USER_INTERACTION = "current-user-interaction"
 USER_MESSAGE_CALLBACK_ID = "user-message-callback-id"
 
+YES_NO = ("Yes", "No")
+
 
 class CallbackData(NamedTuple):
     callback_id: int
@@ -159,9 +169,8 @@ class TelegramBotPlugin(Plugin[UserConfig]):
     async def get_user_by_telegram_user_id(
         self, telegram_user_id: int, send_message_on_failure: bool = True
     ) -> User:
-        for user in await self.get_users():
-            self._logger.info(f"Checking {user=}")
-            user_config: UserConfig = await self.get_config(user)
+        users: list[User] = await self.get_users()
+        for user, user_config in zip(users, await self.get_configs(users)):
             if user_config.user_id == telegram_user_id:
                 return user
 
@@ -327,10 +336,10 @@ class TelegramBotPlugin(Plugin[UserConfig]):
                 async with bot.user_interaction(
                     priority=UserInteractionPriority.HIGH
                 ):
+                    choices = [command.text for command in shown_commands]
+                    choices.append("Cancel")
                     choice = await bot.request_user_choice(
-                        "Please choose a command to run:",
-                        [command.text for command in shown_commands]
-                        + ["Cancel"],
+                        "Please choose a command to run:", choices
                     )
                     if choice == len(shown_commands):
                         return
@@ -380,6 +389,32 @@ class TelegramBotPlugin(Plugin[UserConfig]):
         return
 
 
+def split_message(
+    text: str, max_length: int = constants.MessageLimit.MAX_TEXT_LENGTH
+) -> list[str]:
+    """Split `text` on line boundaries into chunks Telegram will accept."""
+    chunks: list[str] = []
+    # Lines of the chunk being built, joined once when it's full.
+    current: list[str] = []
+    current_length = 0
+    for line in text.splitlines(keepends=True):
+        # A single line that doesn't fit anywhere is split mid-line.
+        while len(line) > max_length:
+            if current:
+                chunks.append("".join(current))
+                current, current_length = [], 0
+            chunks.append(line[:max_length])
+            line = line[max_length:]
+        if current_length + len(line) > max_length:
+            chunks.append("".join(current))
+            current, current_length = [], 0
+        current.append(line)
+        current_length += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
 class UserInteractionPreempted(Exception):
     pass
 
@@ -442,9 +477,15 @@ class TelegramBotApi:
         _logger = logging.getLogger(cls.__name__)
         _logger.info(f"Registering command '{command.text}'")
         app = await cls.get_application()
-        app.bot_data.setdefault(PLUGIN_COMMANDS, {}).setdefault(
-            plugin.canonical_name(), []
-        ).append(command)
+        commands: list[PluginCommand] = app.bot_data.setdefault(
+            PLUGIN_COMMANDS, {}
+        ).setdefault(plugin.canonical_name(), [])
+        # Registering is idempotent, so a restarted `run` doesn't show the
+        # same command twice in the menu.
+        if any(existing.text == command.text for existing in commands):
+            _logger.info(f"Command '{command.text}' is already registered")
+            return
+        commands.append(command)
         _logger.info(
             f"These plugins have registered commands: {', '.join(name for name in app.bot_data[PLUGIN_COMMANDS])}"
         )
@@ -463,9 +504,7 @@ class TelegramBotApi:
         _logger.info("Application initialized")
         user_config: UserConfig = await TelegramBotPlugin.get_config(user)
         _logger.info(f"Getting TelegramBotApi for {user=} with {user_config=}")
-        return TelegramBotApi(
-            (await TelegramBotPlugin.get_config(user)).user_id
-        )
+        return TelegramBotApi(user_config.user_id)
 
     @classmethod
     def set_application(cls, application: Application) -> None:
@@ -527,7 +566,7 @@ class TelegramBotApi:
         return callback_id, event
 
     async def request_user_choice(
-        self, prompt: str, choices: list[str], *, columns: int = 1
+        self, prompt: str, choices: Sequence[str], *, columns: int = 1
     ) -> int:
         app = await self.get_application()
 
@@ -563,6 +602,12 @@ class TelegramBotApi:
             raise ValueError("Expected integer from user")
         return interaction_result
 
+    async def request_yes_no(self, prompt: str, *, columns: int = 1) -> bool:
+        return (
+            await self.request_user_choice(prompt, YES_NO, columns=columns)
+            == 0
+        )
+
     async def request_user_input(self, prompt: str) -> str:
         app: Application = await self.get_application()
 
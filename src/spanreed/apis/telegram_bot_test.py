@@ -0,0 +1,55 @@
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, call, patch
+
+from spanreed.plugin import Plugin
+from spanreed.apis.telegram_bot import (
+    TelegramBotApi,
+    PluginCommand,
+    PLUGIN_COMMANDS,
+    YES_NO,
+    split_message,
+)
+from spanreed.test_utils import DummyPlugin
+
+
+def test_split_message() -> None:
+    assert split_message("") == []
+    assert split_message("short\ntext") == ["short\ntext"]
+    assert split_message("aaa\nbbb\nccc", max_length=8) == [
+        "aaa\nbbb\n",
+        "ccc",
+    ]
+    assert split_message("abcdefghij\nk", max_length=4) == [
+        "abcd",
+        "efgh",
+        "ij\nk",
+    ]
+
+
+def test_register_command_is_idempotent() -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    app = MagicMock(bot_data={})
+    command = PluginCommand(text="Do something", callback=AsyncMock())
+
+    with patch.object(
+        TelegramBotApi, "get_application", AsyncMock(return_value=app)
+    ):
+        asyncio.run(TelegramBotApi.register_command(plugin, command))
+        asyncio.run(TelegramBotApi.register_command(plugin, command))
+
+    assert app.bot_data[PLUGIN_COMMANDS] == {"dummy-plugin": [command]}
+
+
+def test_request_yes_no() -> None:
+    bot = TelegramBotApi(telegram_user_id=4)
+    request_user_choice = AsyncMock(side_effect=[0, 1])
+
+    with patch.object(bot, "request_user_choice", request_user_choice):
+        assert asyncio.run(bot.request_yes_no("Sure?"))
+        assert not asyncio.run(bot.request_yes_no("Really?", columns=2))
+
+    assert request_user_choice.await_args_list == [
+        call("Sure?", YES_NO, columns=1),
+        call("Really?", YES_NO, columns=2),
+    ]
@@ -2,19 +2,64 @@ from __future__ import annotations
 
 from spanreed.storage import redis_api
 import asyncio
+import datetime
+import functools
 import logging
 import json
-from typing import Generic, TypeVar, Optional
+import time
+from typing import Any, AsyncGenerator, Generic, TypeVar, Optional
 from spanreed.user import User
 import abc
-from dataclasses import asdict
+import dataclasses
 
 UC = TypeVar("UC")
 
+# Fetches a page of the users registered to a plugin, along with their name
+# and plugins, in a single round trip. Returns the next SSCAN cursor and the
+# users in the page.
+_GET_USERS_SCRIPT = """
+local page = redis.call('SSCAN', KEYS[1], ARGV[1], 'COUNT', ARGV[2])
+local users = {}
+for i, user_id in ipairs(page[2]) do
+    users[i] = {
+        user_id,
+        redis.call('GET', 'user:' .. user_id .. ':name'),
+        redis.call('SMEMBERS', 'user:' .. user_id .. ':plugins'),
+    }
+end
+return {page[1], users}
+"""
+
+
+def _dataclass_to_json(obj: Any) -> dict[str, Any]:
+    # Unlike `dataclasses.asdict`, this doesn't deep-copy the field values;
+    # the JSON encoder calls back in for any nested dataclasses.
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            field.name: getattr(obj, field.name)
+            for field in dataclasses.fields(obj)
+        }
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable"
+    )
+
 
 class Plugin(abc.ABC, Generic[UC]):
     BASE_LOGGER = logging.getLogger("spanreed.plugin")
-    _plugins: list[Plugin] = []
+    _plugins: dict[str, Plugin] = {}
+    _plugins_by_class: dict[type[Plugin], Plugin] = {}
+
+    # Per-process caches, with their expiry time. Configs only change through
+    # `set_config` and registrations through `register_user` and
+    # `unregister_user`, which evict the relevant entries.
+    CACHE_TTL = datetime.timedelta(minutes=1)
+    _config_cache: dict[str, tuple[float, Optional[bytes]]] = {}
+    # Bumped by `set_config`, so a read that raced with a write doesn't cache
+    # the value it replaced.
+    _config_generations: dict[str, int] = {}
+    _user_plugins_cache: dict[int, tuple[float, set[bytes]]] = {}
+    # Likewise, bumped by `register_user` and `unregister_user`.
+    _user_plugins_generations: dict[int, int] = {}
 
     def __init__(self) -> None:
         Plugin.register(self)
@@ -25,7 +70,9 @@ class Plugin(abc.ABC, Generic[UC]):
     def name(cls) -> str:
         pass
 
+    # Plugin names are constant per class, so these are safe to memoize.
     @classmethod
+    @functools.cache
     def canonical_name(cls) -> str:
         return cls.name().replace(" ", "-").lower()
 
@@ -33,11 +80,17 @@ class Plugin(abc.ABC, Generic[UC]):
     def get_prerequisites(cls) -> list[type[Plugin]]:
         return []
 
+    @classmethod
+    @functools.cache
+    def _get_config_key_prefix(cls) -> str:
+        return f"config:plugin:name={cls.canonical_name()}:user_id="
+
     @classmethod
     def _get_config_key(cls, user: User) -> str:
-        return f"config:plugin:name={cls.canonical_name()}:user_id={user.id}"
+        return cls._get_config_key_prefix() + str(user.id)
 
     @classmethod
+    @functools.cache
     def _get_user_list_key(cls) -> str:
         return f"config:plugin:name={cls.canonical_name()}:users"
 
@@ -61,11 +114,71 @@ class Plugin(abc.ABC, Generic[UC]):
         if config_class is None:
             raise NotImplementedError("This plugin does not have user config.")
 
-        config = await redis_api.get(cls._get_config_key(user))
+        config = await cls._get_raw_config(user)
         if config is None:
             return config_class()
         return config_class(**json.loads(config))
 
+    @classmethod
+    async def _get_raw_config(cls, user: User) -> Optional[bytes]:
+        # Cache the serialized config rather than the config object, since
+        # callers are free to mutate the object they get back.
+        key = cls._get_config_key(user)
+        now = time.monotonic()
+        config: Optional[bytes]
+        if (cached := Plugin._config_cache.get(key)) is not None:
+            expires_at, config = cached
+            if now < expires_at:
+                return config
+
+        generation = Plugin._config_generations.get(key, 0)
+        config = await redis_api.get(key)
+        if Plugin._config_generations.get(key, 0) == generation:
+            Plugin._config_cache[key] = (
+                now + cls.CACHE_TTL.total_seconds(),
+                config,
+            )
+        return config
+
+    @classmethod
+    async def get_configs(cls, users: list[User]) -> list[UC]:
+        """Like `get_config`, for many users with a single Redis round trip."""
+        config_class = cls.get_config_class()
+        if config_class is None:
+            raise NotImplementedError("This plugin does not have user config.")
+
+        return [
+            config_class()
+            if config is None
+            else config_class(**json.loads(config))
+            for config in await cls._get_raw_configs(users)
+        ]
+
+    @classmethod
+    async def _get_raw_configs(
+        cls, users: list[User]
+    ) -> list[Optional[bytes]]:
+        keys = [cls._get_config_key(user) for user in users]
+        now = time.monotonic()
+        configs: dict[str, Optional[bytes]] = {}
+        for key in keys:
+            if (cached := Plugin._config_cache.get(key)) is not None:
+                expires_at, config = cached
+                if now < expires_at:
+                    configs[key] = config
+
+        if missing := [key for key in keys if key not in configs]:
+            expires_at = now + cls.CACHE_TTL.total_seconds()
+            generations = [
+                Plugin._config_generations.get(key, 0) for key in missing
+            ]
+            fetched = await redis_api.mget(missing)
+            for key, generation, config in zip(missing, generations, fetched):
+                configs[key] = config
+                if Plugin._config_generations.get(key, 0) == generation:
+                    Plugin._config_cache[key] = (expires_at, config)
+        return [configs[key] for key in keys]
+
     @classmethod
     async def set_config(cls, user: User, config: UC) -> None:
         if (
@@ -79,14 +192,23 @@ class Plugin(abc.ABC, Generic[UC]):
                 f"got {type(config)}."
             )
 
+        key = cls._get_config_key(user)
         await redis_api.set(
-            cls._get_config_key(user),
-            json.dumps(asdict(config)),  # type: ignore
+            key, json.dumps(config, default=_dataclass_to_json)
+        )
+        Plugin._config_generations[key] = (
+            Plugin._config_generations.get(key, 0) + 1
         )
+        Plugin._config_cache.pop(key, None)
+
+    @classmethod
+    @functools.cache
+    def _get_user_data_key_prefix(cls) -> str:
+        return f"plugin-data:plugin:name={cls.canonical_name()}:user_id="
 
     @classmethod
     def _get_user_data_key(cls, user: User, key: str) -> str:
-        return f"plugin-data:plugin:name={cls.canonical_name()}:user_id={user.id}:{key}"
+        return f"{cls._get_user_data_key_prefix()}{user.id}:{key}"
 
     @classmethod
     async def set_user_data(cls, user: User, key: str, data: str) -> None:
@@ -100,31 +222,61 @@ class Plugin(abc.ABC, Generic[UC]):
         return data
 
     async def get_users(self) -> list[User]:
-        self._logger.info(f"Getting users for plugin {self.canonical_name()}")
-        self._logger.info(f"Getting user list key {self._get_user_list_key()}")
-        user_ids = [
-            int(user_id)
-            for user_id in await redis_api.smembers(self._get_user_list_key())
+        users: list[User] = [
+            user async for page in self.iter_users() for user in page
         ]
-        users: list[User] = []
-        for user_id in user_ids:
-            users.append(await User.find_by_id(user_id=user_id))
-        self._logger.info(f"Done. Found {len(users)} users.")
+        self._logger.info("Done. Found %d users.", len(users))
         return users
 
+    async def iter_users(
+        self, page_size: int = 500
+    ) -> AsyncGenerator[list[User], None]:
+        """Yield the plugin's users in pages of roughly `page_size` users."""
+        self._logger.info(
+            "Getting users for plugin %s from key %s",
+            self.canonical_name(),
+            self._get_user_list_key(),
+        )
+        get_users_script = redis_api.register_script(_GET_USERS_SCRIPT)
+        # SSCAN may return a member more than once while the set is resized.
+        seen_user_ids: set[int] = set()
+        cursor: bytes | int = 0
+        while True:
+            cursor, page = await get_users_script(
+                keys=[self._get_user_list_key()], args=[cursor, page_size]
+            )
+            users: list[User] = []
+            for raw_user_id, name, plugins in page:
+                if (user_id := int(raw_user_id)) not in seen_user_ids:
+                    seen_user_ids.add(user_id)
+                    users.append(User.from_stored(user_id, name, plugins))
+            if users:
+                yield users
+            if int(cursor) == 0:
+                return
+
     async def register_user(self, user: User) -> None:
-        self._logger.info(f"Registering user {user.id} to plugin")
+        self._logger.info("Registering user %d to plugin", user.id)
         from spanreed.apis.telegram_bot import TelegramBotApi
 
         bot: TelegramBotApi = await TelegramBotApi.for_user(user)
 
-        unregistered_plugins: list[Plugin] = [
-            plugin
+        prerequisites: list[Plugin] = [
+            await self.get_plugin_by_class(plugin_cls)
             for plugin_cls in self.get_prerequisites()
-            if not await (
-                plugin := await self.get_plugin_by_class(plugin_cls)
-            ).is_registered(user)
         ]
+        unregistered_plugins: list[Plugin] = []
+        if prerequisites:
+            # Check all prerequisites against a single fetch of the user's
+            # plugins instead of a round trip per prerequisite.
+            registered_plugins: set[bytes] = await self._get_user_plugins(
+                user
+            )
+            unregistered_plugins = [
+                plugin
+                for plugin in prerequisites
+                if plugin.canonical_name().encode() not in registered_plugins
+            ]
 
         if unregistered_plugins:
             choice: int = await bot.request_user_choice(
@@ -136,7 +288,21 @@ class Plugin(abc.ABC, Generic[UC]):
                 await bot.send_message("Okay, we'll skip this plugin for now.")
                 return
 
+            # Registering a plugin that has to ask the user anything can't
+            # overlap with another one, or their prompts would interleave.
+            # The rest only touch storage, so register them concurrently.
+            interactive_plugins: list[Plugin] = []
+            storage_only_plugins: list[Plugin] = []
             for plugin in unregistered_plugins:
+                if plugin.has_user_config() or plugin.get_prerequisites():
+                    interactive_plugins.append(plugin)
+                else:
+                    storage_only_plugins.append(plugin)
+            # A failure cancels the other registrations and is raised here.
+            async with asyncio.TaskGroup() as tg:
+                for plugin in storage_only_plugins:
+                    tg.create_task(plugin.register_user(user))
+            for plugin in interactive_plugins:
                 await plugin.register_user(user)
 
         if self.has_user_config():
@@ -146,12 +312,19 @@ class Plugin(abc.ABC, Generic[UC]):
             )
             await self.ask_for_user_config(user)
 
-        await redis_api.sadd(f"user:{user.id}:plugins", self.canonical_name())
-        await redis_api.sadd(self._get_user_list_key(), user.id)
+        # Both sets must stay in sync, so update them in a single transaction.
+        async with redis_api.pipeline(transaction=True) as pipe:
+            pipe.sadd(f"user:{user.id}:plugins", self.canonical_name())
+            pipe.sadd(self._get_user_list_key(), user.id)
+            await pipe.execute()
+        Plugin._evict_user_plugins(user)
 
     async def unregister_user(self, user: User) -> None:
-        await redis_api.srem(f"user:{user.id}:plugins", self.canonical_name())
-        await redis_api.srem(self._get_user_list_key(), user.id)
+        async with redis_api.pipeline(transaction=True) as pipe:
+            pipe.srem(f"user:{user.id}:plugins", self.canonical_name())
+            pipe.srem(self._get_user_list_key(), user.id)
+            await pipe.execute()
+        Plugin._evict_user_plugins(user)
 
     async def run_for_user(self, user: User) -> None:
         pass
@@ -160,56 +333,86 @@ class Plugin(abc.ABC, Generic[UC]):
     # change during the lifetime of the plugin.
     # TODO: Refactor to allow for dynamic subscription changes.
     async def run(self) -> None:
-        self._logger.info(f"Running plugin {self.canonical_name()}")
+        self._logger.info("Running plugin %s", self.canonical_name())
 
         async with asyncio.TaskGroup() as tg:
-            for user in await self.get_users():
-                self._logger.info(
-                    f"Running plugin {self.canonical_name()} for user"
-                    f" {user.id}"
-                )
-                tg.create_task(self.run_for_user(user))
+            async for users in self.iter_users():
+                for user in users:
+                    self._logger.info(
+                        "Running plugin %s for user %d",
+                        self.canonical_name(),
+                        user.id,
+                    )
+                    tg.create_task(self.run_for_user(user))
 
     @classmethod
     def reset_registry(cls) -> None:
-        cls._plugins = []
+        cls._plugins = {}
+        cls._plugins_by_class = {}
+        Plugin._config_cache = {}
+        Plugin._config_generations = {}
+        Plugin._user_plugins_cache = {}
+        Plugin._user_plugins_generations = {}
 
     @classmethod
     def register(cls, plugin: "Plugin") -> None:
-        if plugin.canonical_name() in [
-            p.canonical_name() for p in cls._plugins
-        ]:
+        if plugin.canonical_name() in cls._plugins:
             raise ValueError(
                 f"Plugin with name {plugin.canonical_name()} already"
                 " registered."
             )
-        cls._plugins.append(plugin)
+        cls._plugins[plugin.canonical_name()] = plugin
+        cls._plugins_by_class[type(plugin)] = plugin
 
     @classmethod
     async def get_all_plugins(cls) -> list["Plugin"]:
-        return cls._plugins
+        return list(cls._plugins.values())
 
     @classmethod
     async def get_plugin_by_class(cls, plugin_cls: type[Plugin]) -> "Plugin":
-        for plugin in cls._plugins:
-            logging.getLogger(__name__).info(
-                f"Checking {plugin.__class__=} against {plugin_cls=}"
-            )
-            if plugin.__class__ == plugin_cls:
-                return plugin
-
-        raise ValueError(f"Plugin {plugin_cls} not found.")
+        try:
+            return cls._plugins_by_class[plugin_cls]
+        except KeyError:
+            raise ValueError(f"Plugin {plugin_cls} not found.") from None
 
     @classmethod
     async def get_plugins_for_user(cls, user: User) -> list["Plugin"]:
-        plugins = []
-        for plugin in cls._plugins:
-            if await plugin.is_registered(user):
-                plugins.append(plugin)
-        return plugins
+        # A single read of the user's plugin set answers every membership
+        # check, instead of one awaited `is_registered` per plugin.
+        registered = await cls._get_user_plugins(user)
+        return [
+            plugin
+            for plugin in cls._plugins.values()
+            if plugin.canonical_name().encode() in registered
+        ]
 
     @classmethod
     async def is_registered(cls, user: User) -> bool:
-        return await redis_api.sismember(
-            f"user:{user.id}:plugins", cls.canonical_name()
+        return cls.canonical_name().encode() in await cls._get_user_plugins(
+            user
+        )
+
+    @classmethod
+    async def _get_user_plugins(cls, user: User) -> set[bytes]:
+        now = time.monotonic()
+        plugins: set[bytes]
+        if (cached := Plugin._user_plugins_cache.get(user.id)) is not None:
+            expires_at, plugins = cached
+            if now < expires_at:
+                return plugins
+
+        generation = Plugin._user_plugins_generations.get(user.id, 0)
+        plugins = await redis_api.smembers(f"user:{user.id}:plugins")
+        if Plugin._user_plugins_generations.get(user.id, 0) == generation:
+            Plugin._user_plugins_cache[user.id] = (
+                now + cls.CACHE_TTL.total_seconds(),
+                plugins,
+            )
+        return plugins
+
+    @staticmethod
+    def _evict_user_plugins(user: User) -> None:
+        Plugin._user_plugins_generations[user.id] = (
+            Plugin._user_plugins_generations.get(user.id, 0) + 1
         )
+        Plugin._user_plugins_cache.pop(user.id, None)
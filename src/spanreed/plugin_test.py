@@ -0,0 +1,271 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, call
+
+from spanreed.plugin import Plugin
+from spanreed.user import User
+from spanreed.test_utils import (
+    patch_redis,
+    patch_telegram_bot,
+    mock_user_find_by_id,
+    DummyPlugin,
+    DummyUserConfig,
+)
+
+
+class OtherDummyPlugin(Plugin):
+    @classmethod
+    def name(cls) -> str:
+        return "Other Dummy Plugin"
+
+
+class DependentDummyPlugin(Plugin):
+    @classmethod
+    def name(cls) -> str:
+        return "Dependent Dummy Plugin"
+
+    @classmethod
+    def get_prerequisites(cls) -> list[type[Plugin]]:
+        return [DummyPlugin, OtherDummyPlugin]
+
+
+@patch_redis
+def test_unregister_user(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+
+    asyncio.run(plugin.unregister_user(user))
+
+    mock_redis.pipeline.assert_called_once_with(transaction=True)
+    mock_pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    assert mock_pipe.srem.call_args_list == [
+        call("user:4:plugins", "dummy-plugin"),
+        call("config:plugin:name=dummy-plugin:users", 4),
+    ]
+    mock_pipe.execute.assert_awaited_once()
+
+
+def test_register() -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    other_plugin = OtherDummyPlugin()
+
+    assert asyncio.run(Plugin.get_all_plugins()) == [plugin, other_plugin]
+    assert asyncio.run(Plugin.get_plugin_by_class(DummyPlugin)) is plugin
+    assert (
+        asyncio.run(Plugin.get_plugin_by_class(OtherDummyPlugin))
+        is other_plugin
+    )
+
+    with pytest.raises(ValueError):
+        DummyPlugin()
+
+
+def test_get_plugin_by_class_not_found() -> None:
+    Plugin.reset_registry()
+    DummyPlugin()
+
+    with pytest.raises(ValueError):
+        asyncio.run(Plugin.get_plugin_by_class(OtherDummyPlugin))
+
+
+def test_canonical_name() -> None:
+    assert DummyPlugin.canonical_name() == "dummy-plugin"
+    assert OtherDummyPlugin.canonical_name() == "other-dummy-plugin"
+    assert (
+        DummyPlugin._get_user_list_key()
+        == "config:plugin:name=dummy-plugin:users"
+    )
+
+
+@patch_redis
+@patch_telegram_bot("spanreed.apis.telegram_bot")
+def test_register_user_with_registered_prerequisites(
+    mock_bot: AsyncMock, mock_redis: MagicMock
+) -> None:
+    Plugin.reset_registry()
+    DummyPlugin()
+    OtherDummyPlugin()
+    plugin = DependentDummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = {b"dummy-plugin", b"other-dummy-plugin"}
+
+    asyncio.run(plugin.register_user(user))
+
+    mock_redis.smembers.assert_awaited_once_with("user:4:plugins")
+    mock_bot.request_user_choice.assert_not_called()
+    mock_pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    assert mock_pipe.sadd.call_args_list == [
+        call("user:4:plugins", "dependent-dummy-plugin"),
+        call("config:plugin:name=dependent-dummy-plugin:users", 4),
+    ]
+
+
+@patch_redis
+@patch_telegram_bot("spanreed.apis.telegram_bot")
+def test_register_user_with_unregistered_prerequisites(
+    mock_bot: AsyncMock, mock_redis: MagicMock
+) -> None:
+    Plugin.reset_registry()
+    DummyPlugin()
+    OtherDummyPlugin()
+    plugin = DependentDummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = {b"dummy-plugin"}
+    mock_bot.request_user_choice.return_value = 1  # Cancel
+
+    asyncio.run(plugin.register_user(user))
+
+    mock_bot.request_user_choice.assert_awaited_once()
+    mock_redis.pipeline.assert_not_called()
+
+
+@patch_redis
+@patch_telegram_bot("spanreed.apis.telegram_bot")
+def test_register_user_registers_prerequisites(
+    mock_bot: AsyncMock, mock_redis: MagicMock
+) -> None:
+    Plugin.reset_registry()
+    DummyPlugin()
+    OtherDummyPlugin()
+    plugin = DependentDummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = set()
+    mock_bot.request_user_choice.return_value = 0  # Okay
+
+    asyncio.run(plugin.register_user(user))
+
+    mock_pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    mock_pipe.sadd.assert_has_calls(
+        [
+            call("user:4:plugins", "dummy-plugin"),
+            call("config:plugin:name=dummy-plugin:users", 4),
+            call("user:4:plugins", "other-dummy-plugin"),
+            call("config:plugin:name=other-dummy-plugin:users", 4),
+            call("user:4:plugins", "dependent-dummy-plugin"),
+            call("config:plugin:name=dependent-dummy-plugin:users", 4),
+        ],
+        any_order=True,
+    )
+
+
+@patch_redis
+def test_get_config_is_cached(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.get.return_value = b'{"value": "stored"}'
+
+    assert asyncio.run(plugin.get_config(user)) == DummyUserConfig("stored")
+    assert asyncio.run(plugin.get_config(user)) == DummyUserConfig("stored")
+    mock_redis.get.assert_awaited_once_with(
+        "config:plugin:name=dummy-plugin:user_id=4"
+    )
+
+    # Setting the config evicts the cached copy.
+    asyncio.run(plugin.set_config(user, DummyUserConfig("new")))
+    mock_redis.set.assert_awaited_once_with(
+        "config:plugin:name=dummy-plugin:user_id=4", '{"value": "new"}'
+    )
+    mock_redis.get.return_value = b'{"value": "new"}'
+    assert asyncio.run(plugin.get_config(user)) == DummyUserConfig("new")
+    assert mock_redis.get.await_count == 2
+
+
+@patch_redis
+def test_get_config_does_not_cache_a_stale_read(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+
+    async def get_racing_with_set_config(key: str) -> bytes:
+        await plugin.set_config(user, DummyUserConfig("new"))
+        return b'{"value": "old"}'
+
+    mock_redis.get.side_effect = get_racing_with_set_config
+    assert asyncio.run(plugin.get_config(user)) == DummyUserConfig("old")
+
+    # The read that raced with `set_config` wasn't cached.
+    mock_redis.get.side_effect = None
+    mock_redis.get.return_value = b'{"value": "new"}'
+    assert asyncio.run(plugin.get_config(user)) == DummyUserConfig("new")
+
+
+@patch_redis
+def test_is_registered_is_cached(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    other_plugin = OtherDummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = {b"dummy-plugin"}
+
+    assert asyncio.run(plugin.is_registered(user))
+    assert not asyncio.run(other_plugin.is_registered(user))
+    mock_redis.smembers.assert_awaited_once_with("user:4:plugins")
+
+    # Unregistering evicts the cached plugin set.
+    asyncio.run(plugin.unregister_user(user))
+    mock_redis.smembers.return_value = set()
+    assert not asyncio.run(plugin.is_registered(user))
+    assert mock_redis.smembers.await_count == 2
+
+
+@patch_redis
+def test_is_registered_does_not_cache_a_stale_read(
+    mock_redis: MagicMock,
+) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+
+    async def smembers_racing_with_unregister(key: str) -> set[bytes]:
+        await plugin.unregister_user(user)
+        return {b"dummy-plugin"}
+
+    mock_redis.smembers.side_effect = smembers_racing_with_unregister
+    assert asyncio.run(plugin.is_registered(user))
+
+    # The read that raced with `unregister_user` wasn't cached.
+    mock_redis.smembers.side_effect = None
+    mock_redis.smembers.return_value = set()
+    assert not asyncio.run(plugin.is_registered(user))
+    assert mock_redis.smembers.await_count == 2
+
+
+@patch_redis
+def test_get_plugins_for_user(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    OtherDummyPlugin()
+    dependent_plugin = DependentDummyPlugin()
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = {
+        b"dummy-plugin",
+        b"dependent-dummy-plugin",
+    }
+
+    assert asyncio.run(Plugin.get_plugins_for_user(user)) == [
+        plugin,
+        dependent_plugin,
+    ]
+    mock_redis.smembers.assert_awaited_once_with("user:4:plugins")
+
+
+@patch_redis
+def test_get_configs(mock_redis: MagicMock) -> None:
+    Plugin.reset_registry()
+    plugin = DummyPlugin()
+    users: list[User] = [mock_user_find_by_id(4), mock_user_find_by_id(5)]
+    mock_redis.get.return_value = b'{"value": "cached"}'
+    asyncio.run(plugin.get_config(users[0]))
+    mock_redis.mget.return_value = [None]
+
+    assert asyncio.run(plugin.get_configs(users)) == [
+        DummyUserConfig("cached"),
+        DummyUserConfig(),
+    ]
+    # Only the user missing from the cache goes to Redis.
+    mock_redis.mget.assert_awaited_once_with(
+        ["config:plugin:name=dummy-plugin:user_id=5"]
+    )
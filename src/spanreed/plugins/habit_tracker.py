@@ -16,7 +16,7 @@ from spanreed.apis.obsidian import ObsidianApi, ObsidianApiTimeoutError
 from spanreed.plugins.spanreed_monitor import suppress_and_log_exception
 
 
-@dataclass
+@dataclass(slots=True)
 class Habit:
     name: str
     description: str
@@ -91,8 +91,8 @@ class HabitTrackerPlugin(Plugin):
                 "How would you describe this habit?"
             )
             habits.append(Habit(habit_name, habit_description))
-            if await bot.request_user_choice(
-                "Do you want to add another habit?", ["Yes", "No"]
+            if not await bot.request_yes_no(
+                "Do you want to add another habit?"
             ):
                 break
 
@@ -127,10 +127,9 @@ class HabitTrackerPlugin(Plugin):
             await obsidian.safe_generate_today_note()
             return await fetch_value()
 
-    async def get_done_habits(self, user: User) -> list[str]:
-        config: UserConfig = await self.get_config(user)
-        obsidian: ObsidianApi = await ObsidianApi.for_user(user)
-        bot: TelegramBotApi = await TelegramBotApi.for_user(user)
+    async def get_done_habits(
+        self, config: UserConfig, obsidian: ObsidianApi, bot: TelegramBotApi
+    ) -> list[str]:
         property_value: Any = await self.get_habit_tracker_property_value(
             obsidian,
             bot,
@@ -151,18 +150,21 @@ class HabitTrackerPlugin(Plugin):
                 )
         return done_habits
 
-    async def get_habits_to_poll(self, user: User) -> list[Habit]:
-        config: UserConfig = await self.get_config(user)
-        done_habits: list[str] = await self.get_done_habits(user)
+    async def get_habits_to_poll(
+        self, config: UserConfig, obsidian: ObsidianApi, bot: TelegramBotApi
+    ) -> list[Habit]:
+        done_habits: set[str] = set(
+            await self.get_done_habits(config, obsidian, bot)
+        )
         return [
             habit
             for habit in config.habits
             if habit.name not in done_habits
         ]
 
-    async def mark_habit_as_done(self, user: User, habit_name: str) -> None:
-        config: UserConfig = await self.get_config(user)
-        obsidian: ObsidianApi = await ObsidianApi.for_user(user)
+    async def mark_habit_as_done(
+        self, config: UserConfig, obsidian: ObsidianApi, habit_name: str
+    ) -> None:
         await obsidian.add_value_to_list_property(
             await obsidian.get_daily_note(config.daily_note_path),
             config.habit_tracker_property_name,
@@ -173,15 +175,20 @@ class HabitTrackerPlugin(Plugin):
         bot: TelegramBotApi = await TelegramBotApi.for_user(user)
 
         self._logger.info(f"Running periodic check for user {user}")
+        # Fetched once per poll and shared by every step below.
+        config: UserConfig = await self.get_config(user)
+        obsidian: ObsidianApi = await ObsidianApi.for_user(user)
         async with suppress_and_log_exception(ObsidianApiTimeoutError):
-            habits: list[Habit] = await self.get_habits_to_poll(user)
+            habits: list[Habit] = await self.get_habits_to_poll(
+                config, obsidian, bot
+            )
             if not habits:
                 return
 
+            # Built once; a habit's choice is removed along with the habit.
+            choices: list[str] = [habit.name.capitalize() for habit in habits]
+            choices.append("Cancel")
             while habits:
-                choices: list[str] = [habit.name.capitalize() for habit in habits] + [
-                    "Cancel"
-                ]
                 choice: int = await bot.request_user_choice(
                     "Did you do any of these habits today?", choices, columns=min(5, len(habits))
 
@@ -189,8 +196,9 @@ class HabitTrackerPlugin(Plugin):
                 if choice == len(habits):
                     return
                 habit: Habit = habits[choice]
-                await self.mark_habit_as_done(user, habit.name)
-                habits.remove(habit)
+                await self.mark_habit_as_done(config, obsidian, habit.name)
+                del habits[choice]
+                del choices[choice]
 
     async def run_for_user(self, user: User) -> None:
         self._logger.info(f"Running for user {user}")
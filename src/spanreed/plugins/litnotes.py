@@ -18,12 +18,10 @@ from spanreed.apis.obsidian_webhook import (
 def _format_book(book: Book) -> str:
     title: str = book.title
     authors: str = ""
-    if book.authors:
-        authors = f" by "
-        if len(book.authors) == 1:
-            authors += book.authors[0]
-        else:
-            authors += ", ".join(book.authors[:-1]) + f"and {book.authors[-1]}"
+    if len(book.authors) == 1:
+        authors = f" by {book.authors[0]}"
+    elif book.authors:
+        authors = f" by {', '.join(book.authors[:-1])}and {book.authors[-1]}"
     return f"{title}{authors} ({book.publication_year})"
 
 
@@ -72,10 +70,7 @@ class LitNotesPlugin(Plugin):
             )
 
     async def _ask_for_free_text(self, bot: TelegramBotApi) -> str:
-        choice = await bot.request_user_choice(
-            "Any free text to add to the note?", ["Yes", "No"]
-        )
-        if choice == 0:
+        if await bot.request_yes_no("Any free text to add to the note?"):
             return await bot.request_user_input("Enter free text:")
         return ""
 
@@ -87,11 +82,7 @@ class LitNotesPlugin(Plugin):
                 prompt = 'Add another "Recommended by"?'
             else:
                 prompt = 'Add "Recommended by"?'
-            choice = await bot.request_user_choice(
-                prompt,
-                ["Yes", "No"],
-            )
-            if choice == 1:
+            if not await bot.request_yes_no(prompt):
                 break
 
             recommended_by.append(
@@ -114,12 +105,10 @@ class LitNotesPlugin(Plugin):
 
         if len(books) == 1:
             book = books[0]
-            choice = await bot.request_user_choice(
+            if await bot.request_yes_no(
                 f"Found one book: {_format_book(book)}.\n"
-                "Is this the one you meant?",
-                ["Yes", "No"],
-            )
-            if choice == 0:
+                "Is this the one you meant?"
+            ):
                 return book
             else:
                 await bot.send_message(
@@ -34,15 +34,26 @@ def test_get_users(mock_redis: MagicMock) -> None:
     Plugin.reset_registry()
     plugin = LitNotesPlugin()
 
-    with patch.object(
-        User,
-        "find_by_id",
-        new=AsyncMock(side_effect=mock_user_find_by_id),
-    ):
-        mock_redis.smembers.return_value = {b"4", b"7"}
-        users: list[User] = asyncio.run(plugin.get_users())
-        assert len(users) == 2
-        assert set(u.id for u in users) == {4, 7}
+    mock_redis.register_script.return_value = AsyncMock(
+        side_effect=[
+            [b"17", [[b"4", b"Test User", [b"lit-notes"]]]],
+            [
+                b"0",
+                [
+                    [b"4", b"Test User", [b"lit-notes"]],
+                    [b"7", b"Other User", [b"lit-notes", b"plugin-manager"]],
+                ],
+            ],
+        ]
+    )
+    users: list[User] = asyncio.run(plugin.get_users())
+    assert len(users) == 2
+    assert set(u.id for u in users) == {4, 7}
+    assert set(u.name for u in users) == {"Test User", "Other User"}
+    assert mock_redis.register_script.return_value.await_args_list == [
+        call(keys=["config:plugin:name=lit-notes:users"], args=[0, 500]),
+        call(keys=["config:plugin:name=lit-notes:users"], args=[b"17", 500]),
+    ]
 
 
 @patch_telegram_bot("spanreed.plugins.litnotes")
@@ -1,9 +1,37 @@
+import asyncio
+
 from spanreed.apis.telegram_bot import TelegramBotApi, PluginCommand
 from spanreed.plugin import Plugin
 from spanreed.user import User
 
 from typing import List
 
+MENU_OPTIONS = (
+    "Register to new plugin",
+    "Unregister from an existing plugin",
+    "Reconfigure an existing plugin",
+    "Cancel",
+)
+
+
+def _plugin_choices(plugins: List[Plugin]) -> List[str]:
+    choices = [p.name() for p in plugins]
+    choices.append("Cancel")
+    return choices
+
+
+def _menu_prompt(user: User, plugins: List[Plugin]) -> str:
+    # The plugin list goes in the prompt itself, so each round of the menu is
+    # a single Telegram message.
+    if not plugins:
+        status = "You are not using any plugins."
+    else:
+        status = (
+            f"You are currently using these plugins, {user.name}: \n"
+            + "\n".join(f"- {p.name()}" for p in plugins)
+        )
+    return f"{status}\n\nWhat would you like to do?"
+
 
 class PluginManagerPlugin(Plugin):
     """A plugin that manages user registration for other plugins."""
@@ -27,75 +55,65 @@ class PluginManagerPlugin(Plugin):
 
     async def _manage_plugins(self, user: User) -> None:
         self._logger.info(f"Managing plugins for user {user.id}")
-        bot: TelegramBotApi = await TelegramBotApi.for_user(user)
-
+        # Both are independent Redis reads, so overlap them.
+        bot, plugins = await asyncio.gather(
+            TelegramBotApi.for_user(user), Plugin.get_plugins_for_user(user)
+        )
+        handlers = (
+            self._register_to_new_plugin,
+            self._unregister_from_an_existing_plugin,
+            self._reconfigure_existing_plugin,
+        )
+        prompt = _menu_prompt(user, plugins)
         while True:
-            plugins = await Plugin.get_plugins_for_user(user)
-            if not plugins:
-                await bot.send_message("You are not using any plugins.")
-            else:
-                await bot.send_message(
-                    f"You are currently using these plugins,"
-                    f" {user.name}: \n"
-                    + "\n".join(f"- {p.name()}" for p in plugins)
-                )
-
-            choice = await bot.request_user_choice(
-                "What would you like to do?",
-                [
-                    "Register to new plugin",
-                    "Unregister from an existing plugin",
-                    "Reconfigure an existing plugin",
-                    "Cancel",
-                ],
-            )
-            if choice == 0:  # Register to new plugin
-                await self._register_to_new_plugin(bot, user)
-            elif choice == 1:  # Unregister from an existing plugin
-                await self._unregister_from_an_existing_plugin(bot, user)
-            elif choice == 2:  # Reconfigure an existing plugin
-                await self._reconfigure_existing_plugin(bot, user)
-            elif choice == 3:  # Cancel
+            choice = await bot.request_user_choice(prompt, MENU_OPTIONS)
+            if choice == len(handlers):  # Cancel
                 break
 
+            await handlers[choice](bot, user, plugins)
+            # The user's plugin set is cached until a handler registers or
+            # unregisters, so this only goes to Redis after a change.
+            if (
+                new_plugins := await Plugin.get_plugins_for_user(user)
+            ) != plugins:
+                plugins = new_plugins
+                prompt = _menu_prompt(user, plugins)
+
     async def _register_to_new_plugin(
-        self, bot: TelegramBotApi, user: User
+        self, bot: TelegramBotApi, user: User, plugins: List[Plugin]
     ) -> None:
         # Filter out plugins that the user is already using.
-        plugins: List[Plugin] = [
+        new_plugins: List[Plugin] = [
             plugin
             for plugin in await Plugin.get_all_plugins()
-            if user.plugins is None
-            or plugin.canonical_name() not in user.plugins
+            if plugin not in plugins
         ]
 
-        if not plugins:
+        if not new_plugins:
             await bot.send_message("There are no plugins to register to.")
             return
 
         choice = await bot.request_user_choice(
             "Which plugin do you want to register to?",
-            [p.name() for p in plugins] + ["Cancel"],
+            _plugin_choices(new_plugins),
         )
-        if choice == len(plugins):  # Cancel
+        if choice == len(new_plugins):  # Cancel
             return
 
-        plugin = plugins[choice]
+        plugin = new_plugins[choice]
         self._logger.info(f"Registering user {user} to plugin {plugin}")
         await plugin.register_user(user)
 
     async def _unregister_from_an_existing_plugin(
-        self, bot: TelegramBotApi, user: User
+        self, bot: TelegramBotApi, user: User, plugins: List[Plugin]
     ) -> None:
-        if not user.plugins:
+        if not plugins:
             await bot.send_message("There are no plugins to unregister from.")
             return
 
-        plugins = await Plugin.get_plugins_for_user(user)
-
         choice = await bot.request_user_choice(
             "Which plugin do you want to unregister from?",
-            [p.name() for p in plugins] + ["Cancel"],
+            _plugin_choices(plugins),
         )
 
         if choice == len(plugins):  # Cancel
@@ -106,24 +124,22 @@ class PluginManagerPlugin(Plugin):
         await plugin.unregister_user(user)
 
     async def _reconfigure_existing_plugin(
-        self, bot: TelegramBotApi, user: User
+        self, bot: TelegramBotApi, user: User, plugins: List[Plugin]
     ) -> None:
-        plugins = [
-            plugin
-            for plugin in await Plugin.get_plugins_for_user(user)
-            if plugin.has_user_config()
+        configurable_plugins = [
+            plugin for plugin in plugins if plugin.has_user_config()
         ]
 
-        if not plugins:
+        if not configurable_plugins:
             await bot.send_message("There are no plugins to reconfigure.")
             return
 
         if (choice := await bot.request_user_choice(
             "Which plugin do you want to reconfigure?",
-            [p.name() for p in plugins] + ["Cancel"],
-        )) == len(plugins):
+            _plugin_choices(configurable_plugins),
+        )) == len(configurable_plugins):
             return
 
-        plugin = plugins[choice]
+        plugin = configurable_plugins[choice]
         self._logger.info(f"Reconfiguring user {user} for plugin {plugin}")
         await plugin.ask_for_user_config(user)
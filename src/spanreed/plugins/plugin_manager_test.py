@@ -0,0 +1,39 @@
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+
+from spanreed.plugin import Plugin
+from spanreed.plugins.plugin_manager import PluginManagerPlugin
+from spanreed.test_utils import (
+    patch_redis,
+    mock_user_find_by_id,
+    patch_telegram_bot,
+    DummyPlugin,
+)
+
+
+@patch_redis
+@patch_telegram_bot("spanreed.plugins.plugin_manager")
+def test_manage_plugins_register(
+    mock_bot: AsyncMock, mock_redis: MagicMock
+) -> None:
+    Plugin.reset_registry()
+    plugin_manager = PluginManagerPlugin()
+    dummy_plugin = DummyPlugin()
+    dummy_plugin.register_user = AsyncMock()  # type: ignore[method-assign]
+    user: MagicMock = mock_user_find_by_id(4)
+    mock_redis.smembers.return_value = {b"plugin-manager"}
+    mock_bot.request_user_choice.side_effect = [
+        0,  # Register to new plugin
+        0,  # Dummy Plugin
+        3,  # Cancel
+    ]
+
+    asyncio.run(plugin_manager._manage_plugins(user))
+
+    dummy_plugin.register_user.assert_awaited_once_with(user)
+    assert mock_bot.request_user_choice.call_args_list[1].args[1] == [
+        "Dummy Plugin",
+        "Cancel",
+    ]
+    # The user's plugin set is read once for the whole session.
+    mock_redis.smembers.assert_awaited_once_with("user:4:plugins")
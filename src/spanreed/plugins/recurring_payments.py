@@ -233,14 +233,8 @@ class RecurringPayment:
 
     @staticmethod
     async def ask_for_verify_recurrence(bot: TelegramBotApi) -> bool:
-        return (
-            True
-            if await bot.request_user_choice(
-                "Would you like me to verify with you every time the recurrence is supposed to happen?",
-                ["Yes", "No"],
-            )
-            == 0
-            else False
+        return await bot.request_yes_no(
+            "Would you like me to verify with you every time the recurrence is supposed to happen?",
         )
 
     @staticmethod
@@ -269,15 +263,11 @@ class RecurringPayment:
         )
 
         obsidian_log: Optional[ObsidianLog] = None
-        if (
-            await bot.request_user_choice(
-                "Would you like to setup automatic logging of each event"
-                " to an Obsidian note?\n"
-                "Note: This requires you to have the Obsidian Webhook plugin."
-                " I'll help you configure it if you haven't already.",
-                ["Yes", "No"],
-            )
-            == 0
+        if await bot.request_yes_no(
+            "Would you like to setup automatic logging of each event"
+            " to an Obsidian note?\n"
+            "Note: This requires you to have the Obsidian Webhook plugin."
+            " I'll help you configure it if you haven't already.",
         ):
             if not (await ObsidianWebhookPlugin.is_registered(user)):
                 await ObsidianWebhookPlugin.ask_for_user_config(user)
@@ -343,14 +333,11 @@ class RecurringPaymentsPlugin(Plugin[UserConfig]):
             logger.info(
                 "Asking for recurring payment. Current: %s", recurring_payments
             )
-            if recurring_payments:
-                choice = await bot.request_user_choice(
-                    f"You currently have {len(recurring_payments)} recurring "
-                    f"payments.\nWould you like to add another?",
-                    ["Yes", "No"],
-                )
-                if choice == 1:
-                    break
+            if recurring_payments and not await bot.request_yes_no(
+                f"You currently have {len(recurring_payments)} recurring "
+                f"payments.\nWould you like to add another?",
+            ):
+                break
 
             todoist: Todoist = await Todoist.for_user(user)
             recurring_payments.append(await RecurringPayment.ask_for_new_recurrence(user, bot, todoist))
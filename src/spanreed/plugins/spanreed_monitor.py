@@ -11,7 +11,7 @@ from typing import AsyncGenerator
 import redis
 import telegram.error
 
-from spanreed.apis.telegram_bot import TelegramBotApi
+from spanreed.apis.telegram_bot import TelegramBotApi, split_message
 from spanreed.user import User
 from spanreed.plugin import Plugin
 from spanreed.storage import redis_api
@@ -48,28 +48,48 @@ class SpanreedMonitorPlugin(Plugin):
                         _, exception = await redis_api.blpop(
                             self.EXCEPTION_QUEUE_NAME
                         )
-                        with suppress(telegram.error.BadRequest):
-                            await bot.send_message(
-                                f"Exception retrieved from storage:\n\n"
-                                f"```python\n{str(exception.decode('utf-8'))}\n```",
-                                parse_html=False,
-                                parse_markdown=True,
-                            )
+                        await self._send_exception(
+                            bot, exception.decode("utf-8")
+                        )
                         await bot.send_message("Spanreed is still running.")
                         await redis_api.delete(self.EXCEPTION_QUEUE_NAME)
         except asyncio.CancelledError:
             self._logger.info("Spanreed Monitor cancelled.")
             await bot.send_message("Spanreed is shutting down.")
 
+    async def _send_exception(
+        self, bot: TelegramBotApi, exception: str
+    ) -> None:
+        header = "Exception retrieved from storage:\n\n"
+        opening, closing = "```python\n", "\n```"
+        # Full tracebacks can exceed Telegram's message length limit, which
+        # would get the whole message rejected.
+        max_length = (
+            telegram.constants.MessageLimit.MAX_TEXT_LENGTH
+            - len(header)
+            - len(opening)
+            - len(closing)
+        )
+        # An empty payload still gets the header, in an empty code block.
+        chunks = split_message(exception, max_length) or [""]
+        for i, chunk in enumerate(chunks):
+            with suppress(telegram.error.BadRequest):
+                await bot.send_message(
+                    (header if i == 0 else "")
+                    + f"{opening}{chunk.rstrip()}{closing}",
+                    parse_html=False,
+                    parse_markdown=True,
+                )
+
     async def _monitor_obsidian_plugin(self, user: User) -> None:
         from spanreed.apis.obsidian import ObsidianPlugin
 
-        obsidian_plugin = await Plugin.get_plugin_by_class(ObsidianPlugin)
-        user_ids = (u.id for u in await obsidian_plugin.get_users())
-        if user.id not in user_ids:
+        # Checks this user's plugin set rather than loading every user of
+        # the Obsidian plugin.
+        if not await ObsidianPlugin.is_registered(user):
             self._logger.info(
                 "Obsidian plugin not enabled for user, skipping monitoring. "
-                f"User: {user.id}, users: {user_ids}"
+                f"User: {user.id}"
             )
 
             return
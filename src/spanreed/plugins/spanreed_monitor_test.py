@@ -0,0 +1,40 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import telegram.constants
+
+from spanreed.plugins.spanreed_monitor import SpanreedMonitorPlugin
+from spanreed.plugin import Plugin
+
+
+def test_send_exception_splits_long_exceptions() -> None:
+    Plugin.reset_registry()
+    plugin = SpanreedMonitorPlugin()
+    bot = AsyncMock()
+    line = "x" * 99 + "\n"
+    exception = line * (telegram.constants.MessageLimit.MAX_TEXT_LENGTH // 50)
+
+    asyncio.run(plugin._send_exception(bot, exception))
+
+    messages = [c.args[0] for c in bot.send_message.await_args_list]
+    assert len(messages) == 3
+    assert messages[0].startswith("Exception retrieved from storage:\n\n")
+    assert not any(m.startswith("Exception") for m in messages[1:])
+    for message in messages:
+        assert len(message) <= telegram.constants.MessageLimit.MAX_TEXT_LENGTH
+        assert message.endswith("```")
+    assert "".join(messages).count(line.strip()) == exception.count("\n")
+
+
+def test_send_exception_empty() -> None:
+    Plugin.reset_registry()
+    plugin = SpanreedMonitorPlugin()
+    bot = AsyncMock()
+
+    asyncio.run(plugin._send_exception(bot, ""))
+
+    bot.send_message.assert_awaited_once_with(
+        "Exception retrieved from storage:\n\n```python\n\n```",
+        parse_html=False,
+        parse_markdown=True,
+    )
@@ -3,7 +3,7 @@ import asyncio
 import pathlib
 import random
 import datetime
-import textwrap
+import time
 
 from spanreed.apis.telegram_bot import (
     TelegramBotApi,
@@ -16,6 +16,24 @@ from spanreed.user import User
 from spanreed.plugin import Plugin
 from spanreed.plugins.spanreed_monitor import suppress_and_log_exception
 
+# ASCII-only, so `\d` means [0-9] rather than any Unicode digit; scan names
+# and the dates typed for them are plain ISO-8601.
+ISO8601_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII)
+UNPROCESSED_SCAN_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2} Scan", re.ASCII)
+
+
+def _parse_last_asked(last_asked: str) -> datetime.datetime:
+    # Stored as integer epoch seconds, which don't depend on the local time
+    # zone or DST.
+    if last_asked.isdigit():
+        return datetime.datetime.fromtimestamp(
+            int(last_asked), tz=datetime.timezone.utc
+        )
+    # Older versions stored a naive local-time ISO-8601 timestamp.
+    return datetime.datetime.fromisoformat(last_asked).astimezone(
+        datetime.timezone.utc
+    )
+
 
 class TimekillerPlugin(Plugin):
     LAST_ASKED_BOOKS_KEY = "currently-reading-books-last-asked"
@@ -60,20 +78,14 @@ class TimekillerPlugin(Plugin):
             "Scan Processing": self.prompt_for_scan_processing,
         }
 
-        last_asked: datetime.datetime = datetime.datetime.now() - datetime.timedelta(
-            days=4
-        )
+        now = datetime.datetime.now(datetime.timezone.utc)
+        last_asked: datetime.datetime = now - datetime.timedelta(days=4)
         last_asked_str: str | None = await self.get_user_data(
             user, self.LAST_ASKED_BOOKS_KEY
         )
         if last_asked_str is not None:
-            try:
-                last_asked = datetime.datetime.fromisoformat(
-                    last_asked_str
-                )
-            except TypeError:
-                raise ValueError(f"{last_asked_str}, {type(last_asked_str)}")
-        if not push or datetime.datetime.now() - last_asked > datetime.timedelta(days=3):
+            last_asked = _parse_last_asked(last_asked_str)
+        if not push or now - last_asked > datetime.timedelta(days=3):
             timekillers["Books"] = self.prompt_for_currently_reading_books
 
         await obsidian.safe_generate_today_note()
@@ -160,11 +172,7 @@ class TimekillerPlugin(Plugin):
             self._logger.info(f"Appending to note {note_name}")
             await webhook_api.append_to_note(note_name, note_content)
             await bot.send_message("Noted!")
-            if (
-                await bot.request_user_choice(
-                    "Another?", ["Yes", "No"], columns=2
-                )
-            ) == 1:
+            if not await bot.request_yes_no("Another?", columns=2):
                 break
 
     async def _poll_for_metrics(
@@ -265,11 +273,9 @@ class TimekillerPlugin(Plugin):
             if choice == 2:
                 mark_as_finished = True
             if choice == 3:
-                mark_as_finished = (
-                    await bot.request_user_choice(
-                        "Do you want to mark it as finished?",
-                        ["Yes", "No"],
-                    ) == 0)
+                mark_as_finished = await bot.request_yes_no(
+                    "Do you want to mark it as finished?"
+                )
             if mark_as_finished:
                 await obsidian.set_value_of_property(
                     book.file["path"], "status", "read"
@@ -313,28 +319,32 @@ class TimekillerPlugin(Plugin):
                     "\n\n### Thoughts\n"
                     + await bot.request_user_input("Go ahead then:"),
                 )
-        await self.set_user_data(user, self.LAST_ASKED_BOOKS_KEY, datetime.datetime.now().isoformat())
+        await self.set_user_data(
+            user, self.LAST_ASKED_BOOKS_KEY, str(int(time.time()))
+        )
 
     async def prompt_for_scan_processing(
         self, _user: User, bot: TelegramBotApi, obsidian: ObsidianApi
     ) -> None:
-        iso8601_date_pattern = re.compile(r"\d{4}-\d{2}-\d{2}")
-        pattern = re.compile(r"\d{4}-\d{2}-\d{2} Scan")
         # TODO: Replace with user config
         base_path: str = "Assets/scans"
         scans = [
             pathlib.PurePosixPath(path)
             for path in await obsidian.list_dir(base_path)
         ]
-        unprocessed_scans = [
-            scan for scan in scans if pattern.search(scan.name) is not None
-        ]
-        unprocessed_pdfs = [
-            scan for scan in unprocessed_scans if scan.suffix == ".pdf"
-        ]
-        if not unprocessed_pdfs:
+        # Check the cheap suffix before the regex, and stop at the first match
+        # since only one scan is processed at a time.
+        pdf_file = next(
+            (
+                scan
+                for scan in scans
+                if scan.suffix == ".pdf"
+                and UNPROCESSED_SCAN_PATTERN.search(scan.name)
+            ),
+            None,
+        )
+        if pdf_file is None:
             return
-        pdf_file = unprocessed_pdfs[0]
         pdf_bytes: bytes = await obsidian.read_binary_file(str(pdf_file))
         await bot.send_document(pdf_file.name, pdf_bytes)
         existing_date = pdf_file.stem[:10]
@@ -349,7 +359,7 @@ class TimekillerPlugin(Plugin):
             if date_choice == 2:
                 return
             if date_choice == 1:
-                while iso8601_date_pattern.match(new_date) is None:
+                while ISO8601_DATE_PATTERN.match(new_date) is None:
                     new_date = await bot.request_user_input(
                         "Enter a date (in ISO-8601 format, YYYY-MM-DD) for the scan:"
                     )
@@ -359,12 +369,8 @@ class TimekillerPlugin(Plugin):
             new_path = pathlib.PurePosixPath(
                 f"Assets/scans/{new_date or existing_date} {new_name}.pdf"
             )
-            if (
-                await bot.request_user_choice(
-                    f"Rename {pdf_file.name} to {new_path.name}?",
-                    ["Yes", "No"],
-                )
-                == 0
+            if await bot.request_yes_no(
+                f"Rename {pdf_file.name} to {new_path.name}?"
             ):
                 try:
                     await obsidian.move_file(str(pdf_file), str(new_path))
@@ -372,11 +378,9 @@ class TimekillerPlugin(Plugin):
                     await bot.send_message(
                         f'File "{new_path.name}" already exists.'
                     )
-                    if (
-                        await bot.request_user_choice(
-                            "Do you want to enter a new name?", ["Yes", "No"]
-                        )
-                    ) == 1:
+                    if not await bot.request_yes_no(
+                        "Do you want to enter a new name?"
+                    ):
                         return
                 else:
                     await bot.send_message("Moved!")
@@ -43,8 +43,11 @@ class TodoistNoOverduePlugin(Plugin[None]):
         self._logger.info(
             f"Found {len(tasks)} overdue tasks for user {user.id}"
         )
-        for task in tasks:
-            await todoist_api.set_due_date_to_today(task)
+        # Each update is an independent Todoist request. If one fails, the
+        # task group cancels the rest and raises all the errors together.
+        async with asyncio.TaskGroup() as tg:
+            for task in tasks:
+                tg.create_task(todoist_api.set_due_date_to_today(task))
 
         self._logger.info(
             f"Updated {len(tasks)} overdue tasks to today for user {user.id}"
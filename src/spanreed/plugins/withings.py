@@ -1,8 +1,5 @@
 import asyncio
 import datetime
-import json
-
-import yaml
 
 from spanreed.plugin import Plugin
 from spanreed.user import User
@@ -14,7 +11,6 @@ from spanreed.apis.withings import (
     AuthenticationFlow,
 )
 from spanreed.apis.obsidian import ObsidianApi
-from spanreed.plugins.spanreed_monitor import suppress_and_log_exception
 import logging
 
 
@@ -17,6 +17,7 @@ def make_redis() -> redis.Redis:
         retry_on_error: Optional[list[type[RedisError]]]
         retry: Retry
         retry_on_timeout: bool
+        decode_responses: bool
 
     common_params = CommonParams(
         ssl_cert_reqs="none",
@@ -27,6 +28,8 @@ def make_redis() -> redis.Redis:
         ],
         retry=Retry(ExponentialBackoff(), 3),
         retry_on_timeout=True,
+        # Callers decode what they need; `int` and `json.loads` take bytes.
+        decode_responses=False,
     )
 
     if os.environ.get("REDIS_URL", ""):
@@ -1,6 +1,8 @@
 import logging
+from dataclasses import dataclass
 from typing import Callable, Any, Coroutine
 from unittest.mock import MagicMock, patch, AsyncMock
+from spanreed.plugin import Plugin
 from spanreed.user import User
 
 
@@ -9,6 +11,7 @@ def patch_redis(f: Callable[..., None]) -> Callable[..., None]:
         with patch("spanreed.plugin.redis_api", new=MagicMock()) as mock_redis:
             redis_async_defs = [
                 "get",
+                "mget",
                 "set",
                 "smembers",
                 "sadd",
@@ -18,6 +21,11 @@ def patch_redis(f: Callable[..., None]) -> Callable[..., None]:
             for def_name in redis_async_defs:
                 setattr(mock_redis, def_name, AsyncMock())
 
+            # Commands queued on a pipeline are sync, only `execute` awaits.
+            mock_pipe = MagicMock()
+            mock_pipe.execute = AsyncMock()
+            mock_redis.pipeline.return_value.__aenter__.return_value = mock_pipe
+
             args = (mock_redis,) + args
             return f(*args, **kwargs)
 
@@ -36,6 +44,21 @@ class EndPluginRun(Exception):
     pass
 
 
+@dataclass
+class DummyUserConfig:
+    value: str = "default"
+
+
+class DummyPlugin(Plugin[DummyUserConfig]):
+    @classmethod
+    def name(cls) -> str:
+        return "Dummy Plugin"
+
+    @classmethod
+    def get_config_class(cls) -> type[DummyUserConfig]:
+        return DummyUserConfig
+
+
 class AsyncContextManager:
     async def __aenter__(
         self, *args: Any, **kwargs: Any
@@ -60,6 +83,16 @@ def patch_telegram_bot(
 
                 mock_bot.user_interaction = MagicMock(AsyncContextManager())
                 mock_bot.request_user_choice = AsyncMock()
+
+                # Keep the real Yes/No mapping so tests can keep faking
+                # `request_user_choice` alone.
+                async def request_yes_no(prompt: str, **_kwargs: Any) -> bool:
+                    choice: int = await mock_bot.request_user_choice(
+                        prompt, ["Yes", "No"]
+                    )
+                    return choice == 0
+
+                mock_bot.request_yes_no = AsyncMock(side_effect=request_yes_no)
                 mock_bot.request_user_input = AsyncMock()
                 mock_bot.send_message = AsyncMock()
                 mock_bot.send_multiple_messages = AsyncMock()
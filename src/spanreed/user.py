@@ -4,6 +4,10 @@ from spanreed.storage import redis_api
 
 
 class User:
+    # `Plugin.iter_users` loads users in bulk via `from_stored`, so keep them
+    # small.
+    __slots__ = ("id", "plugins", "name")
+
     def __init__(self) -> None:
         self.id: int = -1
         self.plugins: list[str] = []
@@ -21,9 +25,14 @@ class User:
 
     async def set_plugins(self, plugins: list[str]) -> None:
         self.plugins = plugins
-        for plugin in plugins:
-            await redis_api.sadd(f"config:plugin:name={plugin}:users", self.id)
-            await redis_api.sadd(f"user:{self.id}:plugins", plugin)
+        if not plugins:
+            return
+
+        async with redis_api.pipeline(transaction=True) as pipe:
+            pipe.sadd(f"user:{self.id}:plugins", *plugins)
+            for plugin in plugins:
+                pipe.sadd(f"config:plugin:name={plugin}:users", self.id)
+            await pipe.execute()
 
     @classmethod
     async def create(cls, name: str = "Master") -> "User":
@@ -43,6 +52,16 @@ class User:
             "utf-8"
         )
 
+    @classmethod
+    def from_stored(
+        cls, user_id: int, name: Optional[bytes], plugins: list[bytes]
+    ) -> "User":
+        self = User()
+        self.id = user_id
+        self.name = "" if name is None else name.decode("utf-8")
+        self.plugins = [plugin.decode("utf-8") for plugin in plugins]
+        return self
+
     @classmethod
     async def find_by_id(cls, user_id: int) -> "User":
         self = User()